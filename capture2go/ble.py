@@ -3,9 +3,13 @@
 # SPDX-License-Identifier: MIT
 
 import asyncio
+import glob
 import sys
 import time
+import types
 from pathlib import Path
+from time import time_ns as _time_ns
+from typing import Mapping
 from typing import AsyncGenerator
 
 from bleak import BleakScanner, BleakClient
@@ -36,14 +40,22 @@ class BleDevice(AbstractDevice):
     """The underlying bleak ``BLEDevice`` instance."""
     rssi: int
     """The most recently observed RSSI (signal strength) for this device (updated only while scanning)."""
+    mtuSize: int | None
+    """The negotiated ATT MTU size in bytes, or None if unknown (set during :py:meth:`connect`)."""
 
     def __init__(self, device: BleakBLEDevice, rssi=0):
         super().__init__()
         self.device = device
         self.rssi = rssi
+        self.mtuSize = None
         self.name = device.name if device.name is not None else ''
 
         self._client = None
+        self._rxChar: BleakGATTCharacteristic | None = None
+        self._txChar: BleakGATTCharacteristic | None = None
+        self._sendKwargs: dict = {}
+        self._rxQueue: asyncio.Queue = asyncio.Queue()
+        self._parseTask: asyncio.Task | None = None
 
     def __repr__(self) -> str:
         return f'BleDevice(state={self.state}, rssi={self.rssi})'
@@ -52,39 +64,80 @@ class BleDevice(AbstractDevice):
         data = package.pack()
         if self._client is None:
             raise RuntimeError('trying to send while BleakClient does not exist yet')
-        await self._client.write_gatt_char(NUS_RX, data)
+        await self._client.write_gatt_char(self._rxChar if self._rxChar is not None else NUS_RX, data,
+                                           **self._sendKwargs)
 
     async def connect(self):
         self._client = BleakClient(self.device, disconnected_callback=self._onDisconnect)
-        self.state = 'connecting'
-        for listener in self._stateListeners:
-            listener(self, 'connecting')
+        self._notifyState('connecting')
         await self._client.connect()
-        await self._client.start_notify(NUS_TX, self._onData)
+        self._negotiateMtu()
+        # Resolve the characteristics once so bleak does not have to look them up by UUID on every write/notify.
+        self._rxChar = self._client.services.get_characteristic(NUS_RX)
+        self._txChar = self._client.services.get_characteristic(NUS_TX)
+        # Prefer write-without-response: it avoids a full ATT round-trip per command and lets the controller queue
+        # multiple writes per connection event.
+        if self._rxChar is not None and 'write-without-response' in self._rxChar.properties:
+            self._sendKwargs = {'response': False}
+        else:
+            self._sendKwargs = {}
+        self._parseTask = asyncio.create_task(self._parseLoop())
+        await self._client.start_notify(self._txChar if self._txChar is not None else NUS_TX, self._onData)
         # The connect sentinel ensures that the queue is not empty if a disconnect sentinel is found.
-        self._queue.put_nowait(self._connectSentinel)
+        self._queuePut(self._connectSentinel)
         self._deviceInfoReceived.clear()
         self._statusReceived.clear()
-        self.state = 'connected'
-        for listener in self._stateListeners:
-            listener(self, 'connected')
+        self._notifyState('connected')
 
     async def disconnect(self):
         if self.state != 'disconnected' and self._client is not None:
             await self._client.disconnect()
-            self.state = 'disconnected'
-            for listener in self._stateListeners:
-                listener(self, 'disconnected')
+            self._cancelParseTask()
+            self._notifyState('disconnected')
+
+    def _negotiateMtu(self):
+        """Determine the negotiated ATT MTU, best-effort and backend-dependent.
+
+        A large MTU lets the sensor pack more samples into one notification, which is essential for streaming
+        throughput. Most backends negotiate this automatically on connect; here we only read the result so callers
+        can size their transfers accordingly. Failures are ignored on backends that do not expose the MTU.
+        """
+        assert self._client is not None
+        try:
+            self.mtuSize = self._client.mtu_size
+        except (NotImplementedError, RuntimeError, AttributeError):
+            self.mtuSize = None
+
+    async def _parseLoop(self):
+        """Background task that parses received chunks, decoupled from bleak's notification delivery.
+
+        Notifications often arrive in bursts (multiple notifications per connection event). Everything currently
+        queued is drained and parsed in one pass, so bleak's callback only has to enqueue the raw chunk and can
+        return immediately.
+        """
+        rxQueue = self._rxQueue
+        while True:
+            chunks = [await rxQueue.get()]
+            while True:
+                try:
+                    chunks.append(rxQueue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            self._feedCoalesced(chunks)
+
+    def _cancelParseTask(self):
+        if self._parseTask is not None:
+            self._parseTask.cancel()
+            self._parseTask = None
 
     def _onData(self, _: BleakGATTCharacteristic, data: bytearray):
         # print(f'received: {data.hex()!r}')
-        self._feed(data, time.time_ns(), True)
+        self._rxQueue.put_nowait((data, _time_ns() if self._needsTimestamp else None))
 
     def _onDisconnect(self, _: BleakClient):
-        self.state = 'disconnected'
-        for listener in self._stateListeners:
-            listener(self, 'disconnected')
-        self._queue.put_nowait(self._disconnectSentinel)
+        self._cancelParseTask()
+        self._notifyState('disconnected')
+        self._queuePut(self._disconnectSentinel)
 
 
 class BleScanner:
@@ -98,37 +151,61 @@ class BleScanner:
                 print(f'Discovered devices: {found}.')
                 if name in found:
                     return found[name]
+
+    Args:
+        updateIntervalMs (int, optional): Minimum interval between scan updates in milliseconds. Advertisements
+            arriving faster than this are coalesced into one update, so the scan loop wakes up at a bounded rate
+            even in dense BLE environments. Defaults to 200.
+        rssiUpdatesTrigger (bool, optional): If True, RSSI changes of already-discovered devices also trigger scan
+            updates. By default, only newly discovered devices do; the ``rssi`` attribute is still updated in place
+            either way. Defaults to False.
     """
-    def __init__(self):
+    def __init__(self, updateIntervalMs=200, rssiUpdatesTrigger=False):
         self.devices = {}
+        self.updateIntervalMs = updateIntervalMs
+        self.rssiUpdatesTrigger = rssiUpdatesTrigger
+        self._revision = 0
 
-    async def scan(self) -> AsyncGenerator[dict[str, BleDevice], None]:
+    async def scan(self, snapshot=False) -> AsyncGenerator[Mapping[str, BleDevice], None]:
         """Asynchronously scan for BLE IMU devices.
 
+        Args:
+            snapshot (bool, optional): If True, yield an independent copy of the device dictionary on every
+                iteration. By default, a read-only live view of the shared dictionary is yielded, which avoids
+                copying the dictionary for every advertisement in dense environments.
+
         Yields:
-            dict[str, BleDevice]: A dictionary mapping device names to :class:`BleDevice` objects.
+            Mapping[str, BleDevice]: A mapping of device names to :class:`BleDevice` objects.
 
         This is an async generator that yields the current set of discovered devices every second or when a new device
         is found or updated.
         """
         self.devices.clear()
-        updated = asyncio.Event()
 
         def callback(device: BleakBLEDevice, advertisementData: AdvertisementData):
             if device.name in self.devices:
                 self.devices[device.name].rssi = advertisementData.rssi
+                if not self.rssiUpdatesTrigger:
+                    return  # Consumers waiting for discoveries do not need to see RSSI-only updates.
             else:
                 self.devices[device.name] = BleDevice(device, advertisementData.rssi)
-            updated.set()
+            self._revision += 1
 
+        liveView = types.MappingProxyType(self.devices)
+        interval = self.updateIntervalMs / 1000
+        lastRevision = -1
+        lastYield = time.monotonic()
         async with BleakScanner(callback, service_uuids=[NUS_SERVICE]):
             while True:
-                try:
-                    await asyncio.wait_for(updated.wait(), timeout=1.0)
-                except (asyncio.exceptions.TimeoutError, TimeoutError):
-                    pass
-                updated.clear()
-                yield self.devices.copy()
+                # Sleep instead of waking up per advertisement: updates are coalesced to at most one yield per
+                # interval, with a one-second heartbeat when nothing changes.
+                await asyncio.sleep(interval)
+                now = time.monotonic()
+                if self._revision == lastRevision and now - lastYield < 1.0:
+                    continue
+                lastRevision = self._revision
+                lastYield = now
+                yield self.devices.copy() if snapshot else liveView
 
 
 async def connect(names: list[str]) -> list[AbstractDevice]:
@@ -157,14 +234,15 @@ async def connect(names: list[str]) -> list[AbstractDevice]:
         RuntimeError: If no matching USB device is found or multiple USB devices are found.
     """
     devices: dict[str, AbstractDevice | None] = {}
+    loop = asyncio.get_running_loop()
 
+    usbPorts: dict[str, asyncio.Future] = {}
     for name in names:
         if name.startswith('IMU_'):
             devices[name] = None
         elif name == 'usb':
-            port = _discoverUsbSerialPort()
-            from .usb import UsbDevice
-            devices[name] = UsbDevice(port)
+            # Port discovery scans the filesystem; run it in a worker thread so it overlaps with the BLE scan.
+            usbPorts[name] = loop.run_in_executor(None, _discoverUsbSerialPort)
         else:
             if sys.platform in ('win32', 'cygwin', 'msys'):
                 assert name.upper().startswith('COM')
@@ -173,19 +251,30 @@ async def connect(names: list[str]) -> list[AbstractDevice]:
             from .usb import UsbDevice
             devices[name] = UsbDevice(name)
 
+    if usbPorts:
+        from .usb import UsbDevice
+        for name, port in usbPorts.items():
+            devices[name] = UsbDevice(await port)
+
+    # Connect each device as soon as it is known instead of waiting for the full discovery to finish.
+    connectTasks = [asyncio.create_task(device.connect()) for device in devices.values() if device is not None]
+
     if not names or any(device is None for device in devices.values()):
         scanner = BleScanner()
         async for found in scanner.scan():
-            devices.update(found)
-            missing = [name for name in names if devices[name] is None]
-            print(f'Devices: {found}, missing: {", ".join(missing) if missing else "none"}.')
+            for name, imu in found.items():
+                if name in devices and devices[name] is None:
+                    devices[name] = imu
+                    connectTasks.append(asyncio.create_task(imu.connect()))
+            missing = [name for name in names if devices.get(name) is None]
+            print(f'Devices: {dict(found)}, missing: {", ".join(missing) if missing else "none"}.')
             if names and not missing:
                 print('All devices discovered, connecting...')
                 break
 
     deviceList = [device for name in names if (device := devices[name]) is not None]
     assert len(deviceList) == len(names), 'did not discover all devices'
-    await asyncio.gather(*[imu.connect() for imu in deviceList])
+    await asyncio.gather(*connectTasks)
     print('Connected.')
     return deviceList
 
@@ -205,10 +294,12 @@ def _discoverUsbSerialPort():
             pattern = 'tty.usbmodem??????1'
         else:
             pattern = 'ttyACM*'
-        candidates = list(Path('/dev').glob(pattern))
-        if len(candidates) == 1:
-            return str(candidates[0].absolute())
-        elif len(candidates) > 1:
-            raise RuntimeError(f'More than one /dev/{pattern} devices found: {sorted([str(c) for c in candidates])}.')
-        else:
+        # iglob yields plain path strings lazily (via os.scandir), so /dev is not fully materialized as Path objects.
+        it = glob.iglob(f'/dev/{pattern}')
+        first = next(it, None)
+        second = next(it, None)
+        if first is None:
             raise RuntimeError(f'No /dev/{pattern} device found.')
+        elif second is not None:
+            raise RuntimeError(f'More than one /dev/{pattern} devices found: {sorted([first, second, *it])}.')
+        return first
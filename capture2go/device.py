@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 import asyncio
+import collections
 import time
 from typing import Any, Callable, Literal, TypeVar, Union
 
@@ -15,6 +16,12 @@ DataListener = Callable[['AbstractDevice', bytes | bytearray, int | None], Any]
 PackageListener = Callable[['AbstractDevice', pkg.AbstractPackage, int | None], Any]
 T = TypeVar('T', bound="pkg.AbstractPackage")
 
+# Data package types ignored while draining the queue after aborting an ongoing streaming session. Precomputed once
+# so the drain loop does a single set lookup per package instead of string matching on class names.
+_ABORT_IGNORE_TYPES = frozenset(
+    cls for cls in pkg.packages.values() if cls.__name__.startswith(('DataFull', 'DataQuat'))
+) | {pkg.DataRawBurst, pkg.DataAccZBurst, pkg.DataFsBytes}
+
 
 class DeviceIsRecording(RuntimeError):
     """
@@ -32,6 +39,21 @@ class DeviceIsStreaming(RuntimeError):
     pass
 
 
+class _ControlSentinel:
+    """Queue marker for connect/disconnect events.
+
+    Using a dedicated class lets poll/apoll recognize both sentinels with a single type check per dequeued package
+    instead of two identity comparisons.
+    """
+    __slots__ = ('kind',)
+
+    def __init__(self, kind: str):
+        self.kind = kind
+
+    def __repr__(self):
+        return f'_ControlSentinel({self.kind!r})'
+
+
 class AbstractDevice:
     """
     Base class that represents a single IMU device (BLE or USB).
@@ -70,24 +92,59 @@ class AbstractDevice:
     """Provides access to the last received status package from the device."""
     deviceInfo: pkg.DataDeviceInfo | None
     """Provides access to the last received device info package from the device."""
+    fsChunkSize: int
+    """Preferred size of a single file-read range request (:py:class:`pkg.CmdFsGetBytes`) in bytes.
+
+    The firmware has no command to negotiate this, so it defaults to 64 KiB, which works well for both transports.
+    Adjust it before starting a download to tune the request granularity for a specific link.
+    """
 
     def __init__(self):
         self.name = ''
         self.state = 'disconnected'
         self.status = None
         self.deviceInfo = None
+        self.fsChunkSize = 64 * 1024
 
         self.unpacker = Unpacker(ignoreInitialGarbage=True)
-        self._queue = asyncio.Queue()
+        # Single-producer/single-consumer package queue. A plain deque with a "not empty" event is considerably
+        # cheaper per package than asyncio.Queue, which pays for waiter bookkeeping on every put/get.
+        self._queue: collections.deque = collections.deque()
+        self._notEmpty = asyncio.Event()
         self._statusReceived = asyncio.Event()
         self._deviceInfoReceived = asyncio.Event()
-        self._connectSentinel = object()
-        self._disconnectSentinel = object()
-
-        self._stateListeners: set[StateListener] = set()
-        self._dataWithRtListeners: set[DataListener] = set()
-        self._dataListeners: set[DataListener] = set()
-        self._packageListeners: set[PackageListener] = set()
+        self._connectSentinel = _ControlSentinel('connect')
+        self._disconnectSentinel = _ControlSentinel('disconnect')
+
+        # Futures awaiting an acknowledgement (keyed by ack class) or a SensorError (keyed by command header).
+        # Resolved with a single dict lookup per package in _dispatchPackages.
+        self._ackWaiters: dict[type, list[asyncio.Future]] = {}
+        self._errorWaiters: dict[int, list[asyncio.Future]] = {}
+
+        # Package types that need special handling in _dispatchPackages, resolved with one dict lookup per package
+        # instead of an isinstance cascade.
+        self._specialHandlers: dict[type, Callable[[pkg.AbstractPackage, int | None], None]] = {
+            pkg.DataDeviceInfo: self._handleDeviceInfo,
+            pkg.DataStatus: self._handleStatus,
+            pkg.DataClockRoundtrip: self._handleClockRoundtrip,
+        }
+
+        # Listeners are kept in lists with cached tuple snapshots. The tuples are rebuilt on add/remove and iterated
+        # in _feed, which runs for every received chunk and should avoid building fresh iterators over mutable
+        # containers on the hot path.
+        self._stateListeners: list[StateListener] = []
+        self._dataWithRtListeners: list[DataListener] = []
+        self._dataListeners: list[DataListener] = []
+        self._packageListeners: list[PackageListener] = []
+        self._stateListenersTuple: tuple[StateListener, ...] = ()
+        self._dataWithRtListenersTuple: tuple[DataListener, ...] = ()
+        self._dataListenersTuple: tuple[DataListener, ...] = ()
+        self._packageListenersTuple: tuple[PackageListener, ...] = ()
+
+        # Whether a receive timestamp has to be captured for incoming chunks. Maintained by the add/remove listener
+        # methods and setCaptureTimestamps so transports can skip the time_ns call when nobody consumes it.
+        self._captureTimestamps = False
+        self._needsTimestamp = False
 
     async def connect(self):
         """Opens a connection to the device."""
@@ -134,19 +191,17 @@ class AbstractDevice:
                 # Wait for ACK and filter out data packages from aborted streaming.
                 keep = []
                 async for package in self:
-                    name = package.__class__.__name__
-                    if (name.startswith(('DataFull', 'DataQuat'))
-                            or name in ('DataRawBurst', 'DataAccZBurst', 'DataFsBytes')):
+                    if type(package) in _ABORT_IGNORE_TYPES:
                         continue  # Ignore data packages but keep everything else.
                     keep.append(package)
                     if isinstance(package, pkg.AckStopStreamingAndClearBuffer):
                         break
-                while not self._queue.empty():
-                    keep.append(self._queue.get_nowait())
+                while self._queue:
+                    keep.append(self._queue.popleft())
 
                 # Put packages back in queue.
                 for package in keep:
-                    self._queue.put_nowait(package)
+                    self._queuePut(package)
 
                 if not self._deviceInfoReceived.is_set():
                     await self.send(pkg.CmdGetDeviceInfo())
@@ -190,15 +245,9 @@ class AbstractDevice:
         loop = asyncio.get_running_loop()
         future = loop.create_future()
 
-        def listener(device, received: pkg.AbstractPackage, timestamp):
-            if type(received) is ackCls:
-                if not future.done():
-                    future.set_result(received)
-            if type(received) is pkg.SensorError and received.command == package.header:
-                if not future.done():
-                    future.set_result(received)
-
-        self.addPackageListener(listener)
+        header = int(package.header)  # type: ignore[arg-type]
+        self._ackWaiters.setdefault(ackCls, []).append(future)
+        self._errorWaiters.setdefault(header, []).append(future)
         try:
             await self.send(package)
             try:
@@ -207,7 +256,51 @@ class AbstractDevice:
                 raise TimeoutError(f'Timeout waiting for ACK ({ackCls.__name__})')
             return result
         finally:
-            self.removePackageListener(listener)
+            self._removeWaiter(self._ackWaiters, ackCls, future)
+            self._removeWaiter(self._errorWaiters, header, future)
+
+    async def drainUntil(self, packageCls: type[T], timeout: float = 3.0) -> T:
+        """Discards queued packages until a package of the given class is found and returns it.
+
+        Already-queued packages are scanned in a tight synchronous loop, so a long backlog (e.g., data packages from
+        an aborted streaming session) is skipped without one event-loop round-trip per package; the method only
+        suspends while the queue is empty.
+
+        Raises a ``TimeoutError`` if no matching package was received within ``timeout`` seconds.
+
+        Args:
+            packageCls (type[T]): The class of the package to wait for.
+            timeout (float, optional): Maximum time in seconds to wait. Defaults to 3.
+        """
+        queue = self._queue
+        notEmpty = self._notEmpty
+
+        async def drain():
+            while True:
+                while queue:
+                    package = queue.popleft()
+                    if package.__class__ is _ControlSentinel:
+                        continue
+                    if isinstance(package, packageCls):
+                        return package
+                notEmpty.clear()
+                await notEmpty.wait()
+
+        try:
+            return await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f'Timeout draining for {packageCls.__name__}')
+
+    @staticmethod
+    def _removeWaiter(waiters: dict, key, future: asyncio.Future):
+        pending = waiters.get(key)
+        if pending is not None:
+            try:
+                pending.remove(future)
+            except ValueError:
+                pass
+            if not pending:
+                del waiters[key]
 
     def addStateListener(self, listener: StateListener):
         """Registers a callback function that is called when the connection state changes.
@@ -216,7 +309,8 @@ class AbstractDevice:
             listener (:py:data:`StateListener`): A function that gets called with the device and the new state as
                 parameters.
         """
-        self._stateListeners.add(listener)
+        self._stateListeners.append(listener)
+        self._stateListenersTuple = tuple(self._stateListeners)
 
     def removeStateListener(self, listener: StateListener):
         """Unregisters a callback function that is called when the connection state changes.
@@ -226,6 +320,7 @@ class AbstractDevice:
                 listener.
         """
         self._stateListeners.remove(listener)
+        self._stateListenersTuple = tuple(self._stateListeners)
 
     def addDataWithRtListener(self, listener: DataListener):
         """Registers a callback that is invoked when raw data (including RT packages) is received.
@@ -237,7 +332,9 @@ class AbstractDevice:
             listener (:py:data:`DataListener`): A function that gets called with the device, the raw data chunk
                 (including RT packages), and an optional receive timestamp.
         """
-        self._dataWithRtListeners.add(listener)
+        self._dataWithRtListeners.append(listener)
+        self._dataWithRtListenersTuple = tuple(self._dataWithRtListeners)
+        self._updateNeedsTimestamp()
 
     def removeDataWithRtListener(self, listener: DataListener):
         """Unregisters a previously registered raw data (with RT) listener.
@@ -247,6 +344,8 @@ class AbstractDevice:
                 listener.
         """
         self._dataWithRtListeners.remove(listener)
+        self._dataWithRtListenersTuple = tuple(self._dataWithRtListeners)
+        self._updateNeedsTimestamp()
 
     def addDataListener(self, listener: DataListener):
         """Registers a callback that is invoked when data is received (after RT extraction).
@@ -258,7 +357,9 @@ class AbstractDevice:
             listener (:py:data:`DataListener`): A function that gets called with the device, the data chunk after RT
                 extraction, and an optional receive timestamp.
         """
-        self._dataListeners.add(listener)
+        self._dataListeners.append(listener)
+        self._dataListenersTuple = tuple(self._dataListeners)
+        self._updateNeedsTimestamp()
 
     def removeDataListener(self, listener: DataListener):
         """Unregisters a previously registered data listener.
@@ -267,6 +368,8 @@ class AbstractDevice:
             listener (:py:data:`DataListener`): A callback function that was previously registered as a data listener.
         """
         self._dataListeners.remove(listener)
+        self._dataListenersTuple = tuple(self._dataListeners)
+        self._updateNeedsTimestamp()
 
     def addPackageListener(self, listener: PackageListener):
         """Registers a callback that is invoked for each extracted package.
@@ -278,7 +381,9 @@ class AbstractDevice:
             listener (:py:data:`PackageListener`): A function that gets called with the device, the package,
                 and an optional receive timestamp.
         """
-        self._packageListeners.add(listener)
+        self._packageListeners.append(listener)
+        self._packageListenersTuple = tuple(self._packageListeners)
+        self._updateNeedsTimestamp()
 
     def removePackageListener(self, listener: PackageListener):
         """Unregisters a previously registered package listener.
@@ -288,34 +393,56 @@ class AbstractDevice:
                 listener.
         """
         self._packageListeners.remove(listener)
+        self._packageListenersTuple = tuple(self._packageListeners)
+        self._updateNeedsTimestamp()
+
+    def setCaptureTimestamps(self, enabled: bool):
+        """Force capturing receive timestamps even when no listeners are registered.
+
+        Receive timestamps are only captured when at least one data or package listener is registered, which avoids
+        one clock read per incoming chunk for consumers that only poll packages. Enable this if you rely on
+        ``hostReceiveTimestamp`` of :py:class:`pkg.DataClockRoundtrip` packages without registering a listener.
+
+        Args:
+            enabled (bool): True to always capture receive timestamps.
+        """
+        self._captureTimestamps = enabled
+        self._updateNeedsTimestamp()
+
+    def _updateNeedsTimestamp(self):
+        self._needsTimestamp = bool(
+            self._captureTimestamps or self._dataWithRtListenersTuple or self._dataListenersTuple
+            or self._packageListenersTuple)
 
     def poll(self):
         """
         Polls the device for received packages. Returns either a package or None.
         """
-        try:
-            while True:
-                package = self._queue.get_nowait()
-                if package is self._connectSentinel or package is self._disconnectSentinel:
-                    continue
-                return package
-        except asyncio.QueueEmpty:
-            return None
+        queue = self._queue
+        while queue:
+            package = queue.popleft()
+            if package.__class__ is _ControlSentinel:
+                continue
+            return package
+        return None
 
     async def apoll(self):
         """
         Asynchronous poll method that returns the next package. If no package is available, the method waits without
         blocking the event loop.
         """
+        queue = self._queue
+        notEmpty = self._notEmpty
         while True:
-            package = await self._queue.get()
-            if package is self._connectSentinel:
+            if not queue:
+                notEmpty.clear()
+                await notEmpty.wait()
                 continue
-            if package is self._disconnectSentinel:
-                if self._queue.empty():
+            package = queue.popleft()
+            if package.__class__ is _ControlSentinel:
+                if package is self._disconnectSentinel and not queue:
                     raise StopAsyncIteration
-                else:
-                    continue  # Ignore because the device must have been reconnected in the meantime.
+                continue  # Ignore otherwise; on disconnect, a non-empty queue means the device reconnected.
             return package
 
     def __aiter__(self):
@@ -325,36 +452,118 @@ class AbstractDevice:
         package = await self.apoll()
         return package
 
+    def _notifyState(self, newState: DeviceState):
+        self.state = newState
+        for listener in self._stateListenersTuple:
+            listener(self, newState)
+
+    def _queuePut(self, package):
+        self._queue.append(package)
+        if not self._notEmpty.is_set():
+            self._notEmpty.set()
+
     def _feed(self, data: bytes | bytearray, timestamp: int | None, extractRtPackages: bool):
+        unpacker = self.unpacker
         if extractRtPackages:
-            for listener in self._dataWithRtListeners:
+            dataWithRtListeners = self._dataWithRtListenersTuple
+            if dataWithRtListeners:
+                for listener in dataWithRtListeners:
+                    listener(self, data, timestamp)
+            if unpacker.mayContainRt(data):
+                data = unpacker.extractRtPackages(data, timestamp)
+            elif data:
+                data = data[1:]  # Chunk only contains the RT count byte (0xFF) and stream data.
+
+        dataListeners = self._dataListenersTuple
+        if dataListeners:
+            for listener in dataListeners:
                 listener(self, data, timestamp)
-            data = self.unpacker.extractRtPackages(data, timestamp)
+        unpacker.feed(data)
+        self._dispatchPackages(timestamp)
 
-        for listener in self._dataListeners:
-            listener(self, data, timestamp)
-        self.unpacker.feed(data)
+    def _feedCoalesced(self, chunks: list):
+        """Feed multiple (data, timestamp) chunks that arrived back-to-back in one parse pass.
 
-        while True:
-            try:
-                package = next(self.unpacker)
-
-                if isinstance(package, pkg.DataDeviceInfo):
-                    self.deviceInfo = package
-                    self.name = f'IMU_{package.parse()["serial"]}'
-                    self._deviceInfoReceived.set()
-                elif isinstance(package, pkg.DataStatus):
-                    self.status = package
-                    self._statusReceived.set()
-                elif (isinstance(package, pkg.DataClockRoundtrip) and timestamp is not None
-                      and package.hostReceiveTimestamp == 0):
-                    package.hostReceiveTimestamp = timestamp
-
-                for listener in self._packageListeners:
+        RT packages are extracted per chunk (each BLE chunk carries its own RT count byte), but the remaining stream
+        data is concatenated and fed to the unpacker once, so the package loop runs a single time per batch.
+        """
+        if len(chunks) == 1:
+            data, timestamp = chunks[0]
+            self._feed(data, timestamp, True)
+            return
+
+        unpacker = self.unpacker
+        dataWithRtListeners = self._dataWithRtListenersTuple
+        coalesced = bytearray()
+        for data, timestamp in chunks:
+            if dataWithRtListeners:
+                for listener in dataWithRtListeners:
+                    listener(self, data, timestamp)
+            if unpacker.mayContainRt(data):
+                coalesced += unpacker.extractRtPackages(data, timestamp)
+            elif data:
+                coalesced += memoryview(data)[1:]
+
+        timestamp = chunks[-1][1]
+        dataListeners = self._dataListenersTuple
+        if dataListeners:
+            for listener in dataListeners:
+                listener(self, coalesced, timestamp)
+        unpacker.feed(coalesced)
+        self._dispatchPackages(timestamp)
+
+    def _handleDeviceInfo(self, package: pkg.AbstractPackage, timestamp: int | None):
+        self.deviceInfo = package
+        self.name = f'IMU_{package.parse()["serial"]}'
+        if not self._deviceInfoReceived.is_set():
+            self._deviceInfoReceived.set()
+
+    def _handleStatus(self, package: pkg.AbstractPackage, timestamp: int | None):
+        self.status = package
+        if not self._statusReceived.is_set():
+            self._statusReceived.set()
+
+    def _handleClockRoundtrip(self, package: pkg.AbstractPackage, timestamp: int | None):
+        if timestamp is not None and package.hostReceiveTimestamp == 0:
+            package.hostReceiveTimestamp = timestamp
+
+    def _dispatchPackages(self, timestamp: int | None):
+        unpacker = self.unpacker
+        packageListeners = self._packageListenersTuple
+        ackWaiters = self._ackWaiters
+        errorWaiters = self._errorWaiters
+        sensorErrorCls = pkg.SensorError
+        specialHandlers = self._specialHandlers
+        queue = self._queue
+        append = queue.append
+        # A for loop lets the interpreter consume the unpacker's StopIteration in C instead of paying for a
+        # Python-level try/except per package.
+        for package in unpacker:
+            handler = specialHandlers.get(type(package))
+            if handler is not None:
+                handler(package, timestamp)
+
+            if ackWaiters:
+                waiters = ackWaiters.get(type(package))
+                if waiters:
+                    for future in waiters:
+                        if not future.done():
+                            future.set_result(package)
+            if errorWaiters and type(package) is sensorErrorCls:
+                waiters = errorWaiters.get(package.command)
+                if waiters:
+                    for future in waiters:
+                        if not future.done():
+                            future.set_result(package)
+
+            if packageListeners:
+                for listener in packageListeners:
                     listener(self, package, timestamp)
-                self._queue.put_nowait(package)
-            except StopIteration:
-                return
+            append(package)
+
+        # Wake up waiters once per chunk instead of once per package.
+        if queue and not self._notEmpty.is_set():
+            self._notEmpty.set()
 
 
 class FilePlaybackDevice(AbstractDevice):
@@ -378,14 +587,10 @@ class FilePlaybackDevice(AbstractDevice):
         self.state = 'connected'
 
     async def connect(self):
-        self.state = 'connected'
-        for listener in self._stateListeners:
-            listener(self, 'connected')
+        self._notifyState('connected')
 
     async def disconnect(self):
-        self.state = 'disconnected'
-        for listener in self._stateListeners:
-            listener(self, 'disconnected')
+        self._notifyState('disconnected')
 
     async def init(self, setTime=False, abortRecording=False, abortStreaming=False):
         pass
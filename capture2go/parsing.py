@@ -3,13 +3,33 @@
 # SPDX-License-Identifier: MIT
 
 import ctypes
-import zlib
+import mmap
+import struct
 from collections import defaultdict
 from pathlib import Path
 
 import numpy as np
 
 from . import pkg
+from .utils import decodeQuatArray
+
+try:
+    # python-isal provides a SIMD-accelerated CRC32 with the same polynomial and interface as zlib.crc32. The CRC is
+    # computed for every frame on the ingest path, so this is worth an optional dependency.
+    from isal.isal_zlib import crc32
+except ImportError:
+    from zlib import crc32
+
+# ctypes.sizeof() performs reflection on every call; the payload sizes are class constants, so compute them once at
+# import instead of once per frame.
+_PACKAGE_SIZES: dict[type, int] = {cls: ctypes.sizeof(cls) for cls in pkg.packages.values()}
+
+# Frame header of SensorSerialPackage (startByte, crc32, payloadSize, header). Peeking at the four header fields with
+# a precompiled struct is much cheaper than constructing a ctypes object per frame.
+_HEADER = struct.Struct('<BIBH')
+
+READ_BUFFER_SIZE = 128 * 1024
+"""Block size (in bytes) used when reading from a file, so the cost of read() calls is amortized over many frames."""
 
 
 class Unpacker:
@@ -23,6 +43,10 @@ class Unpacker:
         ignoreInitialGarbage (bool, optional): If True, ignore bytes until a valid frame is found. This can be useful if
             file parsing is started in the middle of a byte stream and initial invalid data is to be expected. Defaults
             to False.
+        verifyCrc (bool, optional): If False, skip the per-frame CRC check. Only use this for trusted input (e.g.,
+            files that were already verified during download); it removes the CRC computation from the per-frame
+            cost. Note that resynchronization (``ignoreInitialGarbage``) relies on CRC checks and is less robust
+            without them. Defaults to True.
 
     Example::
 
@@ -31,19 +55,46 @@ class Unpacker:
         for package in unpacker:
             print(package)
     """
-    def __init__(self, f=None, ignoreInitialGarbage=False):
+    def __init__(self, f=None, ignoreInitialGarbage=False, verifyCrc=True):
         self.f = f
         self.ignoreInitialGarbage = ignoreInitialGarbage
+        self.verifyCrc = verifyCrc
         self.waitForAckStopStreamingAndClearBuffer = False
         self.buffer = bytearray()
+        # Consumed bytes are skipped by advancing this offset instead of deleting from the front of the buffer
+        # (which memmoves the remainder per frame); the buffer is compacted once the offset grows large.
+        self._start = 0
+        # True when parsing from a fixed external buffer (see from_buffer): no reads, no compaction.
+        self._fixed = False
         self.rtPackages = []
 
-    def feed(self, data: bytes | bytearray):
+    @classmethod
+    def from_buffer(cls, data, ignoreInitialGarbage=False, verifyCrc=True) -> 'Unpacker':
+        """
+        Create an Unpacker that parses directly from a fixed in-memory buffer.
+
+        The buffer (e.g., bytes or a read-only :py:class:`mmap.mmap`) is never copied or modified; iteration only
+        advances an offset into it. Do not call :py:meth:`feed` on an Unpacker created this way.
+
+        Args:
+            data: Buffer containing the complete binary stream.
+            ignoreInitialGarbage (bool, optional): See :py:class:`Unpacker`. Defaults to False.
+            verifyCrc (bool, optional): See :py:class:`Unpacker`. Defaults to True.
+
+        Returns:
+            Unpacker: An unpacker bound to the given buffer.
+        """
+        unpacker = cls(ignoreInitialGarbage=ignoreInitialGarbage, verifyCrc=verifyCrc)
+        unpacker.buffer = data
+        unpacker._fixed = True
+        return unpacker
+
+    def feed(self, data: bytes | bytearray | memoryview):
         """
         Add new binary data to the internal buffer for parsing.
 
         Args:
-            data (bytes | bytearray): Raw bytes to add to the buffer.
+            data (bytes | bytearray | memoryview): Raw bytes to add to the buffer.
         """
         self.buffer.extend(data)
         # print(f'feed {self.buffer.hex()}')
@@ -53,6 +104,24 @@ class Unpacker:
         Clear the internal buffer.
         """
         self.buffer.clear()
+        self._start = 0
+
+    @staticmethod
+    def mayContainRt(data: bytes | bytearray) -> bool:
+        """
+        Check if a raw BLE chunk can contain real-time (RT) packages.
+
+        The first byte of every BLE chunk encodes the RT package count as ``0xFF - count``, so a leading ``0xFF``
+        means that no RT packages are present. This check is constant-time and can be used to skip
+        :py:meth:`extractRtPackages` entirely for the common case of plain data chunks.
+
+        Args:
+            data (bytes | bytearray): Raw BLE chunk including the RT count byte.
+
+        Returns:
+            bool: True if the chunk may contain RT packages.
+        """
+        return len(data) > 0 and data[0] != 0xFF
 
     def extractRtPackages(self, data: bytes | bytearray, receiveTimestamp=None):
         """
@@ -73,45 +142,48 @@ class Unpacker:
             RuntimeError: If a package cannot be parsed or CRC check fails.
 
         Returns:
-            bytes | bytearray: Remaining data after RT packages have been extracted.
+            memoryview: Remaining data after RT packages have been extracted (a view into ``data``, no copy).
         """
         if len(data) == 0:
-            return data
+            return memoryview(data)
         count = 0xFF - data[0]
         pos = 1
         assert count <= 3, f'unexpected number of RT packages: {count}'
 
+        # A single memoryview over the input lets the CRC check and package construction work on sub-views instead
+        # of allocating temporary bytes objects for every RT package.
+        mv = memoryview(data)
         for _ in range(count):
             assert len(data) >= pos + 8, 'not enough data available to extract frame of RT package'
 
-            frame = pkg.SensorSerialPackage.frombytes(data[pos:])
-            assert frame.startByte == 2, f'frame error in RT stream, {frame}'
-            assert len(data) >= pos + 8 + frame.payloadSize, 'not enough data available to extract RT package ' \
-                f'(data has {len(data)} bytes, package {hex(frame.header)} with size {frame.payloadSize} ' \
-                f'expected from {pos+6}..{pos+8+frame.payloadSize})'
-            expected_crc = zlib.crc32(data[pos+6:pos+frame.payloadSize+8])
-            assert expected_crc == frame.crc32, f'crc mismatch: {expected_crc} != {frame.crc32}, ' \
-                                                f'cmd: 0x{frame.header:04X}, size: {frame.payloadSize}, ' \
-                                                f'content: 0x{data[pos+6:pos+frame.payloadSize+8].hex()}'
+            startByte, frame_crc32, payloadSize, header = _HEADER.unpack_from(data, pos)
+            assert startByte == 2, f'frame error in RT stream, {pkg.SensorSerialPackage.frombytes(mv[pos:])}'
+            assert len(data) >= pos + 8 + payloadSize, 'not enough data available to extract RT package ' \
+                f'(data has {len(data)} bytes, package {hex(header)} with size {payloadSize} ' \
+                f'expected from {pos+6}..{pos+8+payloadSize})'
+            expected_crc = crc32(mv[pos+6:pos+payloadSize+8])
+            assert expected_crc == frame_crc32, f'crc mismatch: {expected_crc} != {frame_crc32}, ' \
+                                                f'cmd: 0x{header:04X}, size: {payloadSize}, ' \
+                                                f'content: 0x{mv[pos+6:pos+payloadSize+8].hex()}'
 
             try:
-                cls = pkg.packages[frame.header]
+                cls = pkg.packages[header]
             except KeyError:
-                raise RuntimeError(f'unknown class {hex(frame.header)}')
+                raise RuntimeError(f'unknown class {hex(header)}')
 
-            if frame.payloadSize != (sizeof := ctypes.sizeof(cls)):  # type: ignore
+            if payloadSize != (sizeof := _PACKAGE_SIZES[cls]):
                 raise RuntimeError('Unexpected payload size for package: '
-                                   f'{frame.payloadSize} != {sizeof}, cmd: 0x{frame.header:04X}, cls: {cls}')
+                                   f'{payloadSize} != {sizeof}, cmd: 0x{header:04X}, cls: {cls}')
 
-            package = cls.frombytes(data[pos+8:pos+frame.payloadSize+8])
+            package = cls.frombytes(mv[pos+8:pos+payloadSize+8])
 
             if isinstance(package, pkg.DataClockRoundtrip) and receiveTimestamp is not None:
                 package.hostReceiveTimestamp = receiveTimestamp
 
             self.rtPackages.append(package)
-            pos += frame.payloadSize + 8
+            pos += payloadSize + 8
 
-        return data[pos:]
+        return mv[pos:]
 
     def __iter__(self):
         return self
@@ -122,60 +194,127 @@ class Unpacker:
 
         while True:
             self._ensureAvailable(8)
+            start = self._start
 
-            frame = pkg.SensorSerialPackage.frombytes(self.buffer)
+            startByte, frame_crc32, payloadSize, header = _HEADER.unpack_from(self.buffer, start)
             if self.waitForAckStopStreamingAndClearBuffer:
-                if frame.startByte != 2:
-                    del self.buffer[:1]
+                if startByte != 2:
+                    self._resync(start)
                     continue
-                elif frame.header != pkg.SensorHeader.ACK_STOP_STREAMING_AND_CLEAR_BUFFER:
-                    del self.buffer[:1]
+                elif header != pkg.SensorHeader.ACK_STOP_STREAMING_AND_CLEAR_BUFFER:
+                    self._resync(start)
                     continue
                 else:
                     self.waitForAckStopStreamingAndClearBuffer = False
             elif self.ignoreInitialGarbage:
-                if frame.startByte != 2:
-                    del self.buffer[:1]
+                if startByte != 2:
+                    self._resync(start)
                     continue
             else:
-                assert frame.startByte == 2, f'frame error, {frame}'
-
-            self._ensureAvailable(8 + frame.payloadSize)
-            expected_crc = zlib.crc32(self.buffer[6:frame.payloadSize+8])
-            if expected_crc != frame.crc32:
-                if self.ignoreInitialGarbage:
-                    del self.buffer[:1]
+                assert startByte == 2, \
+                    f'frame error, {pkg.SensorSerialPackage.frombytes(self.buffer[start:start+8])}'
+
+            self._ensureAvailable(8 + payloadSize)
+            start = self._start
+            end = start + payloadSize + 8
+            with memoryview(self.buffer) as mv:
+                if self.verifyCrc:
+                    expected_crc = crc32(mv[start+6:end])
+                    if expected_crc != frame_crc32:
+                        if self.ignoreInitialGarbage:
+                            self._resync(start)
+                            continue
+                        else:
+                            raise RuntimeError(f'crc mismatch: {expected_crc} != {frame_crc32}, '
+                                               f'cmd: 0x{header:04X}, size: {payloadSize}, '
+                                               f'content: 0x{bytes(mv[start+6:end]).hex()}')
+
+                try:
+                    cls = pkg.packages[header]
+                except KeyError:
+                    self._start = end
+                    print(f'unknown class {hex(header)}')
                     continue
-                else:
-                    raise RuntimeError(f'crc mismatch: {expected_crc} != {frame.crc32}, '
-                                       f'cmd: 0x{frame.header:04X}, size: {frame.payloadSize}, '
-                                       f'content: 0x{self.buffer[6:frame.payloadSize+8].hex()}')
-
-            try:
-                cls = pkg.packages[frame.header]
-            except KeyError:
-                del self.buffer[:frame.payloadSize + 8]
-                print(f'unknown class {hex(frame.header)}')
-                continue
 
-            if not getattr(cls, 'variable_size', False):
-                if frame.payloadSize != (sizeof := ctypes.sizeof(cls)):  # type: ignore
-                    raise RuntimeError('Unexpected payload size for package: '
-                                       f'{frame.payloadSize} != {sizeof}, cmd: 0x{frame.header:04X}, cls: {cls}')
+                if getattr(cls, 'variable_size', False):
+                    # Variable-size packages (DataFsBytes) keep a reference to their payload beyond frombytes().
+                    # Hand them a bytes copy: a view into the parse buffer would pin the buffer (breaking the next
+                    # resize) and its contents would change on compaction.
+                    package = cls.frombytes(bytes(mv[start+8:end]))
+                else:
+                    if payloadSize != (sizeof := _PACKAGE_SIZES[cls]):
+                        raise RuntimeError('Unexpected payload size for package: '
+                                           f'{payloadSize} != {sizeof}, cmd: 0x{header:04X}, cls: {cls}')
 
-            package = cls.frombytes(self.buffer[8:frame.payloadSize+8])
-            del self.buffer[:frame.payloadSize + 8]
+                    package = cls.frombytes(mv[start+8:end])
+            self._start = end
             self.ignoreInitialGarbage = False
             return package
 
+    def _resync(self, start):
+        # Jump directly to the next candidate start byte. find() is a single memchr scan, instead of re-entering the
+        # parse loop once per skipped garbage byte.
+        nxt = self.buffer.find(b'\x02', start + 1)
+        self._start = nxt if nxt >= 0 else len(self.buffer)
+
     def _ensureAvailable(self, N):
-        if self.f is not None and len(self.buffer) < N:
-            self.feed(self.f.read(N - len(self.buffer)))
-        if len(self.buffer) < N:
+        if self._fixed:  # Fixed external buffer: just a bounds check.
+            if len(self.buffer) - self._start < N:
+                raise StopIteration
+            return
+        # Compact the buffer once the consumed prefix has grown large, so the amortized cost stays O(1) per byte.
+        if self._start > 65536:
+            del self.buffer[:self._start]
+            self._start = 0
+        if self.f is not None and len(self.buffer) - self._start < N:
+            self.feed(self.f.read(max(N - (len(self.buffer) - self._start), READ_BUFFER_SIZE)))
+        if len(self.buffer) - self._start < N:
             raise StopIteration
 
 
-def loadBinaryFile(filename: str | Path) -> dict[str, dict[str, np.ndarray]]:
+def _structuredArray(cls: type, entries: list) -> np.ndarray:
+    """View a list of fixed-size package structs as one structured NumPy array.
+
+    The structs are copied once into a contiguous ctypes array (a plain memcpy per package, without intermediate
+    bytes objects), which the returned array then shares zero-copy.
+    """
+    buf = (cls * len(entries))()
+    for i, package in enumerate(entries):
+        buf[i] = package
+    return np.frombuffer(buf, dtype=np.dtype(cls))
+
+
+def _parseFixedBatch(cls: type, entries: list) -> dict[str, np.ndarray]:
+    """Vectorized equivalent of calling ``parse()`` on every entry of a single-sample fixed-point data package."""
+    arr = _structuredArray(cls, entries)
+    quat, restDetected, magDistDetected = decodeQuatArray(arr['quat'])
+    delta = arr['delta'] * pkg.DELTA_SCALE_FACTOR
+    # addHeading() for a pure heading rotation [cos(delta/2), 0, 0, sin(delta/2)], expanded and vectorized.
+    c = np.cos(delta / 2)
+    s = np.sin(delta / 2)
+    quat9D = np.empty_like(quat)
+    quat9D[:, 0] = c*quat[:, 0] - s*quat[:, 3]
+    quat9D[:, 1] = c*quat[:, 1] - s*quat[:, 2]
+    quat9D[:, 2] = c*quat[:, 2] + s*quat[:, 1]
+    quat9D[:, 3] = c*quat[:, 3] + s*quat[:, 0]
+
+    fields: dict[str, np.ndarray] = {'timestamp': arr['timestamp']}
+    names = {name for name, _ in cls._fields_}
+    if 'gyr' in names:
+        fields['gyr'] = arr['gyr'] * pkg.GYR_SCALE_FACTOR
+        fields['acc'] = arr['acc'] * pkg.ACC_SCALE_FACTOR
+    if 'mag' in names:
+        fields['mag'] = arr['mag'] * pkg.MAG_SCALE_FACTOR
+    fields['quat'] = quat
+    fields['quat9D'] = quat9D
+    fields['delta'] = delta
+    fields['restDetected'] = restDetected
+    fields['magDistDetected'] = magDistDetected
+    fields['errorFlags'] = arr['errorFlags']
+    return fields
+
+
+def loadBinaryFile(filename: str | Path, verifyCrc: bool = True) -> dict[str, dict[str, np.ndarray]]:
     """
     Load and parse a binary Capture2Go recording file into NumPy arrays.
 
@@ -185,35 +324,67 @@ def loadBinaryFile(filename: str | Path) -> dict[str, dict[str, np.ndarray]]:
     Args:
         filename (str | Path): Path to the binary recording file. Can be a string or pathlib.Path object.
             Files with a `.gz` extension are automatically decompressed.
+        verifyCrc (bool, optional): If False, skip the per-frame CRC check for faster loading of trusted files.
+            Defaults to True.
 
     Returns:
         Nested dictionary where the outer key is the package class name (e.g., ``DataFullPacked200Hz``) and the value
         is a dictionary mapping field names to NumPy arrays containing all values for that field.
     """
-    entries_by_key = defaultdict(list)
+    packages_by_cls: defaultdict[type, list] = defaultdict(list)
     is_gzip = Path(filename).suffix == '.gz'
     if is_gzip:
-        import gzip
+        try:
+            # python-isal also ships a SIMD-accelerated gzip reader with the same interface as the stdlib module.
+            from isal import igzip as gzip
+        except ImportError:
+            import gzip
 
-    with gzip.open(filename, 'rb') if is_gzip else open(filename, 'rb') as f:
-        unpacker = Unpacker(f, ignoreInitialGarbage=True)
-        for package in unpacker:
-            key = package.__class__.__name__
-            entries_by_key[key].append(package.parse())
+    if is_gzip:
+        with gzip.open(filename, 'rb') as f:
+            unpacker = Unpacker(f, ignoreInitialGarbage=True, verifyCrc=verifyCrc)
+            for package in unpacker:
+                packages_by_cls[package.__class__].append(package)
+    elif (size := Path(filename).stat().st_size) > 0:
+        # Map uncompressed files into memory and parse from the fixed buffer: no read() calls and no copies into a
+        # growing parse buffer. The packages copy their payload out, so the mapping can be closed afterwards.
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            unpacker = Unpacker.from_buffer(mm, ignoreInitialGarbage=True, verifyCrc=verifyCrc)
+            for package in unpacker:
+                packages_by_cls[package.__class__].append(package)
 
     data: dict[str, dict[str, np.ndarray]] = {}
-    for key, entries in entries_by_key.items():
+    for cls, entries in packages_by_cls.items():
         if not entries:
             continue
-        data[key] = {}
-        for k in entries[0]:
-            first = entries[0][k]
+        if cls.parse is pkg.AbstractPackage.parse and not getattr(cls, 'variable_size', False):
+            # Fixed-layout package without custom parsing: view the raw structs through a structured dtype and split
+            # into one array per field, instead of parsing each package into a dict.
+            arr = _structuredArray(cls, entries)
+            data[cls.__name__] = {name: arr[name] for name, _ in cls._fields_}
+            continue
+        if issubclass(cls, (pkg.DataFullFixed, pkg.DataFull6DFixed, pkg.DataQuatFixed)):
+            # Single-sample fixed-point packages: parse all packages at once instead of calling parse() per package.
+            # This mirrors the per-package parse() output but uses vectorized scaling and quaternion decoding.
+            data[cls.__name__] = _parseFixedBatch(cls, entries)
+            continue
+        fields: dict[str, np.ndarray] = {}
+        parsed = [e.parse() for e in entries]
+        for k, first in parsed[0].items():
+            # The dtype and shape are uniform per package class, so they only need to be inspected once per field;
+            # the values are then written straight into a preallocated array without intermediate lists.
             if isinstance(first, np.ndarray):
                 if first.ndim == 2:
-                    val = np.concatenate([e[k] for e in entries])
+                    val = np.empty((len(parsed),) + first.shape, first.dtype)
+                    for i, e in enumerate(parsed):
+                        val[i] = e[k]
+                    val = val.reshape(-1, first.shape[1])
                 else:
-                    val = np.array([e[k] for e in entries])
+                    val = np.stack([e[k] for e in parsed])
+            elif isinstance(first, (bool, int, float, np.generic)):
+                val = np.fromiter((e[k] for e in parsed), dtype=np.result_type(first), count=len(parsed))
             else:
-                val = np.array([e[k] for e in entries])
-            data[key][k] = val
+                val = np.array([e[k] for e in parsed])
+            fields[k] = val
+        data[cls.__name__] = fields
     return data
@@ -949,7 +949,8 @@ class DataClockRoundtrip(AbstractPackage):
     directly when sending the package.
 
     The host should then set ``hostReceiveTimestamp`` directly after receiving the package. (The Python SDK does this
-    automatically.)
+    automatically if a data or package listener is registered or receive timestamps were enabled with
+    :py:meth:`capture2go.AbstractDevice.setCaptureTimestamps`; otherwise the field stays zero.)
 
     Calculate ``(hostReceiveTimestamp + sensorReceiveTimestamp - hostSendTimestamp - sensorSendTimestamp)/2`` to
     estimate the transmission delay and ``(hostSendTimestamp + hostReceiveTimestamp - sensorReceiveTimestamp -
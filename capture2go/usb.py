@@ -14,13 +14,26 @@ def _readSerial(ser: serial.Serial, loop: asyncio.AbstractEventLoop, device: 'Us
     """
     This function is running in a thread to continuously read data from the serial port.
     Without using threads, the receive buffer might fill up easily when data processing takes too long.
+
+    Received chunks are collected in a shared list and the event loop is only woken up when no drain is scheduled
+    yet, so a burst of reads results in a single cross-thread call instead of one per chunk.
     """
     try:
         while True:
-            waiting = ser.in_waiting
-            data = ser.read(waiting if waiting >= 16 else 256)
+            # Block until the first byte arrives, then drain whatever else is already buffered. This avoids both
+            # polling and the read-timeout latency when data trickles in.
+            data = ser.read(1)
             if data:
-                loop.call_soon_threadsafe(device._onData, time.time_ns(), data)
+                waiting = ser.in_waiting
+                if waiting:
+                    data += ser.read(waiting)
+                timestamp = time.time_ns() if device._needsTimestamp else None
+                with device._rxLock:
+                    device._rxPending.append((data, timestamp))
+                    schedule = not device._rxScheduled
+                    device._rxScheduled = True
+                if schedule:
+                    loop.call_soon_threadsafe(device._drainSerial)
     except (serial.SerialException, OSError, TypeError):
         loop.call_soon_threadsafe(device._onData, time.time_ns(), None)  # Disconnect sentinel.
 
@@ -39,12 +52,19 @@ class UsbDevice(AbstractDevice):
         self._baud = baud
         self._ser = None
         self._thread = None
+        # Chunks read by the serial thread but not yet parsed, guarded by the lock. _rxScheduled tracks whether a
+        # _drainSerial call is already pending on the event loop.
+        self._rxLock = threading.Lock()
+        self._rxPending: list[tuple[bytes, int | None]] = []
+        self._rxScheduled = False
 
     async def connect(self):
         assert self._ser is None, 'must be disconnected'
 
-        self._ser = serial.Serial(self._device, self._baud, timeout=0.01)
+        self._ser = serial.Serial(self._device, self._baud, timeout=None)
         self._ser.reset_input_buffer()
+        self._rxPending = []
+        self._rxScheduled = False
 
         self._thread = threading.Thread(target=_readSerial, args=(self._ser, asyncio.get_running_loop(), self))
         self._thread.daemon = True
@@ -52,11 +72,9 @@ class UsbDevice(AbstractDevice):
 
         self._deviceInfoReceived.clear()
         self._statusReceived.clear()
-        self.state = 'connected'
-        for listener in self._stateListeners:
-            listener(self, 'connected')
+        self._notifyState('connected')
         # The connect sentinel ensures that the queue is not empty if a disconnect sentinel is found.
-        self._queue.put_nowait(self._connectSentinel)
+        self._queuePut(self._connectSentinel)
 
     async def disconnect(self):
         self._disconnect()
@@ -72,16 +90,29 @@ class UsbDevice(AbstractDevice):
         assert self._ser is not None
         assert self._thread is not None
 
+        self._ser.cancel_read()  # Unblock the reader thread, which waits in a blocking read.
         self._ser.close()
         del self._ser
         self._ser = None
 
         self._thread.join()
         self._thread = None
-        self.state = 'disconnected'
-        for listener in self._stateListeners:
-            listener(self, 'disconnected')
-        self._queue.put_nowait(self._disconnectSentinel)
+        self._notifyState('disconnected')
+        self._queuePut(self._disconnectSentinel)
+
+    def _drainSerial(self):
+        with self._rxLock:
+            chunks = self._rxPending
+            self._rxPending = []
+            self._rxScheduled = False
+        if not chunks:
+            return
+        if len(chunks) == 1:
+            data, timestamp = chunks[0]
+        else:
+            data = b''.join(d for d, _ in chunks)
+            timestamp = chunks[-1][1]
+        self._feed(data, timestamp, extractRtPackages=False)
 
     def _onData(self, timestamp: int, data: bytes | None):
         if data is None:
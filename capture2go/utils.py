@@ -7,70 +7,92 @@ import random
 
 import numpy as np
 
+# Scale and offset for the 20-bit quaternion components in the compressed 64-bit encoding (see decodeQuat), computed
+# once at import instead of per decoded component.
+_INV_SCALE = math.sqrt(2) / 0xFFFFF
+_OFFSET = 1 / math.sqrt(2)
+
 
 def qmult(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
     """
     Multiply two quaternions.
 
+    Both arguments broadcast against each other, so batches of quaternions can be multiplied in a single call.
+
     Args:
-        q1 (np.ndarray): First quaternion, shape (4,).
-        q2 (np.ndarray): Second quaternion, shape (4,).
+        q1 (np.ndarray): First quaternion(s), shape (..., 4).
+        q2 (np.ndarray): Second quaternion(s), shape (..., 4).
 
     Returns:
-        np.ndarray: The product quaternion, shape (4,).
+        np.ndarray: The product quaternion(s), shape (..., 4).
     """
-    assert q1.shape == q2.shape == (4,)
-    return np.array(
-        [
-            q1[0]*q2[0] - q1[1]*q2[1] - q1[2]*q2[2] - q1[3]*q2[3],
-            q1[0]*q2[1] + q1[1]*q2[0] + q1[2]*q2[3] - q1[3]*q2[2],
-            q1[0]*q2[2] - q1[1]*q2[3] + q1[2]*q2[0] + q1[3]*q2[1],
-            q1[0]*q2[3] + q1[1]*q2[2] - q1[2]*q2[1] + q1[3]*q2[0],
-        ], float)
+    q1 = np.asarray(q1, float)
+    q2 = np.asarray(q2, float)
+    assert q1.shape[-1] == 4 and q2.shape[-1] == 4
+    out = np.empty(np.broadcast_shapes(q1.shape, q2.shape))
+    out[..., 0] = q1[..., 0]*q2[..., 0] - q1[..., 1]*q2[..., 1] - q1[..., 2]*q2[..., 2] - q1[..., 3]*q2[..., 3]
+    out[..., 1] = q1[..., 0]*q2[..., 1] + q1[..., 1]*q2[..., 0] + q1[..., 2]*q2[..., 3] - q1[..., 3]*q2[..., 2]
+    out[..., 2] = q1[..., 0]*q2[..., 2] - q1[..., 1]*q2[..., 3] + q1[..., 2]*q2[..., 0] + q1[..., 3]*q2[..., 1]
+    out[..., 3] = q1[..., 0]*q2[..., 3] + q1[..., 1]*q2[..., 2] - q1[..., 2]*q2[..., 1] + q1[..., 3]*q2[..., 0]
+    return out
 
 
 def rotate(q: np.ndarray, v: np.ndarray) -> np.ndarray:
     """
-    Rotate a 3D vector by a quaternion.
+    Rotate 3D vectors by quaternions.
+
+    Both arguments broadcast against each other, so batches of vectors can be rotated in a single call.
 
     Args:
-        q (np.ndarray): Quaternion, shape (4,).
-        v (np.ndarray): 3D vector, shape (3,).
+        q (np.ndarray): Quaternion(s), shape (..., 4).
+        v (np.ndarray): 3D vector(s), shape (..., 3).
 
     Returns:
-        np.ndarray: Rotated 3D vector, shape (3,).
+        np.ndarray: Rotated 3D vector(s), shape (..., 3).
     """
-    q = q.copy()
-    assert q.shape == (4,)
-    assert v.shape == (3,)
-    return np.array(
-        [
-            (1 - 2*q[2]**2 - 2*q[3]**2)*v[0] + 2*v[1]*(q[2]*q[1] - q[0]*q[3]) + 2*v[2]*(q[0]*q[2] + q[3]*q[1]),
-            2*v[0]*(q[0]*q[3] + q[2]*q[1]) + v[1]*(1 - 2*q[1]**2 - 2*q[3]**2) + 2*v[2]*(q[2]*q[3] - q[1]*q[0]),
-            2*v[0]*(q[3]*q[1] - q[0]*q[2]) + 2*v[1]*(q[0]*q[1] + q[3]*q[2]) + v[2]*(1 - 2*q[1]**2 - 2*q[2]**2),
-        ], float)
+    q = np.asarray(q, float)
+    v = np.asarray(v, float)
+    assert q.shape[-1] == 4 and v.shape[-1] == 3
+    out = np.empty(np.broadcast_shapes(q.shape[:-1], v.shape[:-1]) + (3,))
+    q0, q1, q2, q3 = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    v0, v1, v2 = v[..., 0], v[..., 1], v[..., 2]
+    # Rotation matrix entries, each product computed once and shared between the output rows.
+    xx, yy, zz = 2*q1*q1, 2*q2*q2, 2*q3*q3
+    wx, wy, wz = 2*q0*q1, 2*q0*q2, 2*q0*q3
+    xy, xz, yz = 2*q1*q2, 2*q1*q3, 2*q2*q3
+    out[..., 0] = (1 - yy - zz)*v0 + (xy - wz)*v1 + (wy + xz)*v2
+    out[..., 1] = (wz + xy)*v0 + (1 - xx - zz)*v1 + (yz - wx)*v2
+    out[..., 2] = (xz - wy)*v0 + (wx + yz)*v1 + (1 - xx - yy)*v2
+    return out
 
 
 def rotateinv(q: np.ndarray, v: np.ndarray) -> np.ndarray:
     """
-    Rotate a 3D vector by the inverse of a quaternion.
+    Rotate 3D vectors by the inverse of quaternions.
+
+    Both arguments broadcast against each other, so batches of vectors can be rotated in a single call.
 
     Args:
-        q (np.ndarray): Quaternion, shape (4,).
-        v (np.ndarray): 3D vector, shape (3,).
+        q (np.ndarray): Quaternion(s), shape (..., 4).
+        v (np.ndarray): 3D vector(s), shape (..., 3).
 
     Returns:
-        np.ndarray: Rotated 3D vector, shape (3,).
+        np.ndarray: Rotated 3D vector(s), shape (..., 3).
     """
-    q = q.copy()
-    assert q.shape == (4,)
-    assert v.shape == (3,)
-    return np.array(
-        [
-            (1 - 2*q[2]**2 - 2*q[3]**2)*v[0] + 2*v[1]*(q[2]*q[1] + q[0]*q[3]) + 2*v[2]*(-q[0]*q[2] + q[3]*q[1]),
-            2*v[0]*(-q[0]*q[3] + q[2]*q[1]) + v[1]*(1 - 2*q[1]**2 - 2*q[3]**2) + 2*v[2]*(q[2]*q[3] + q[1]*q[0]),
-            2*v[0]*(q[3]*q[1] + q[0]*q[2]) + 2*v[1]*(-q[0]*q[1] + q[3]*q[2]) + v[2]*(1 - 2*q[1]**2 - 2*q[2]**2),
-        ], float)
+    q = np.asarray(q, float)
+    v = np.asarray(v, float)
+    assert q.shape[-1] == 4 and v.shape[-1] == 3
+    out = np.empty(np.broadcast_shapes(q.shape[:-1], v.shape[:-1]) + (3,))
+    q0, q1, q2, q3 = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    v0, v1, v2 = v[..., 0], v[..., 1], v[..., 2]
+    # Rotation matrix entries, each product computed once and shared between the output rows.
+    xx, yy, zz = 2*q1*q1, 2*q2*q2, 2*q3*q3
+    wx, wy, wz = 2*q0*q1, 2*q0*q2, 2*q0*q3
+    xy, xz, yz = 2*q1*q2, 2*q1*q3, 2*q2*q3
+    out[..., 0] = (1 - yy - zz)*v0 + (xy + wz)*v1 + (xz - wy)*v2
+    out[..., 1] = (xy - wz)*v0 + (1 - xx - zz)*v1 + (yz + wx)*v2
+    out[..., 2] = (xz + wy)*v0 + (yz - wx)*v1 + (1 - xx - yy)*v2
+    return out
 
 
 def quatFromGyr(gyr: np.ndarray, rate: float) -> np.ndarray:
@@ -84,15 +106,15 @@ def quatFromGyr(gyr: np.ndarray, rate: float) -> np.ndarray:
     Returns:
         np.ndarray: Quaternion(s), shape (..., 4).
     """
-    norm = np.linalg.norm(gyr, axis=-1)
-    angle = norm / rate
-    zeroaxis = angle < np.finfo(float).eps
-    norm[zeroaxis] = 1  # angle and gyr will be zero
-    q = np.zeros(gyr.shape[:-1] + (4,), float)
-    q[..., 0] = np.cos(angle / 2)
-    q[..., 1] = np.sin(angle / 2) * gyr[..., 0] / norm
-    q[..., 2] = np.sin(angle / 2) * gyr[..., 1] / norm
-    q[..., 3] = np.sin(angle / 2) * gyr[..., 2] / norm
+    norm = np.asarray(np.linalg.norm(gyr, axis=-1))
+    half = 0.5 / rate * norm
+    # sin/divide are computed once and shared by all three vector components. The where= mask avoids division by
+    # zero without writing a placeholder into norm; masked-out entries keep the 0 from zeros_like (gyr is zero there).
+    s = np.zeros_like(norm)
+    np.divide(np.sin(half), norm, out=s, where=norm > np.finfo(float).eps)
+    q = np.empty(gyr.shape[:-1] + (4,), float)
+    q[..., 0] = np.cos(half)
+    np.multiply(gyr, s[..., None], out=q[..., 1:])
     return q
 
 
@@ -112,15 +134,17 @@ def addHeading(q: np.ndarray, delta: float) -> np.ndarray:
 
 def eulerAngles(q: np.ndarray, axes: str = 'zyx', intrinsic: bool = True) -> np.ndarray:
     """
-    Convert a quaternion to Euler angles.
+    Convert quaternions to Euler angles.
+
+    Accepts batches of quaternions, so whole arrays can be converted in a single call.
 
     Args:
-        q (np.ndarray): Quaternion, shape (4,).
+        q (np.ndarray): Quaternion(s), shape (..., 4).
         axes (str, optional): Rotation sequence, e.g., 'zyx'. Defaults to 'zyx'.
         intrinsic (bool, optional): If True, use intrinsic rotations. Defaults to True.
 
     Returns:
-        np.ndarray: Euler angles in radians, order depends on axes and intrinsic.
+        np.ndarray: Euler angles in radians, shape (..., 3), order depends on axes and intrinsic.
 
     Raises:
         ValueError: If the axes sequence is invalid.
@@ -153,23 +177,28 @@ def eulerAngles(q: np.ndarray, axes: str = 'zyx', intrinsic: bool = True) -> np.
     else:  # anti-cyclic order
         s = -1
 
+    q = np.asarray(q, float)
+    assert q.shape[-1] == 4
+
     if a == c:  # proper Euler angles
-        angle1 = np.arctan2(q[a] * q[b] - s * q[d] * q[0],
-                            q[b] * q[0] + s * q[a] * q[d])
-        angle2 = np.arccos(np.clip(q[0] ** 2 + q[a] ** 2 - q[b] ** 2 - q[d] ** 2, -1, 1))
-        angle3 = np.arctan2(q[a] * q[b] + s * q[d] * q[0],
-                            q[b] * q[0] - s * q[a] * q[d])
+        q0, qa, qb, qd = q[..., 0], q[..., a], q[..., b], q[..., d]
+        angle1 = np.arctan2(qa * qb - s * qd * q0,
+                            qb * q0 + s * qa * qd)
+        angle2 = np.arccos(np.clip(q0 ** 2 + qa ** 2 - qb ** 2 - qd ** 2, -1, 1))
+        angle3 = np.arctan2(qa * qb + s * qd * q0,
+                            qb * q0 - s * qa * qd)
     else:  # Tait-Bryan
-        angle1 = np.arctan2(2 * (q[a] * q[0] + s * q[b] * q[c]),
-                            q[0] ** 2 - q[a] ** 2 - q[b] ** 2 + q[c] ** 2)
-        angle2 = np.arcsin(np.clip(2 * (q[b] * q[0] - s * q[a] * q[c]), -1, 1))
-        angle3 = np.arctan2(2 * (s * q[a] * q[b] + q[c] * q[0]),
-                            q[0] ** 2 + q[a] ** 2 - q[b] ** 2 - q[c] ** 2)
+        q0, qa, qb, qc = q[..., 0], q[..., a], q[..., b], q[..., c]
+        angle1 = np.arctan2(2 * (qa * q0 + s * qb * qc),
+                            q0 ** 2 - qa ** 2 - qb ** 2 + qc ** 2)
+        angle2 = np.arcsin(np.clip(2 * (qb * q0 - s * qa * qc), -1, 1))
+        angle3 = np.arctan2(2 * (s * qa * qb + qc * q0),
+                            q0 ** 2 + qa ** 2 - qb ** 2 - qc ** 2)
 
     if intrinsic:
-        return np.array((angle3, angle2, angle1), float)
+        return np.stack((angle3, angle2, angle1), axis=-1)
     else:
-        return np.array((angle1, angle2, angle3), float)
+        return np.stack((angle1, angle2, angle3), axis=-1)
 
 
 def decodeQuat(quat: int) -> tuple[np.ndarray, bool, bool]:
@@ -185,24 +214,67 @@ def decodeQuat(quat: int) -> tuple[np.ndarray, bool, bool]:
             - bool: outRest flag.
             - bool: outMagDist flag.
     """
-    out = np.empty(4)
     outRest = bool((quat >> 62) & 1)
     outMagDist = bool((quat >> 63) & 1)
     ax = (quat >> 60) & 3
-    sqSum = 0
-    for i in range(3, 0, -1):
-        val = float(quat & 0xFFFFF) / float(0xFFFFF / math.sqrt(2)) - 1/math.sqrt(2)
-        sqSum += val**2
-        out[(ax+i) % 4] = val
-        quat >>= 20
+    # Unrolled bit extraction: one multiply and subtract per component using the module-level constants.
+    v1 = ((quat >> 40) & 0xFFFFF) * _INV_SCALE - _OFFSET
+    v2 = ((quat >> 20) & 0xFFFFF) * _INV_SCALE - _OFFSET
+    v3 = (quat & 0xFFFFF) * _INV_SCALE - _OFFSET
+    sqSum = v1*v1 + v2*v2 + v3*v3
+    out = np.empty(4)
     if sqSum > 1:  # Note: This should never ever happen. Do not remove this warning!
         print(f'warning: invalid quat {quat} with sqSum {sqSum}')
         out.fill(np.nan)
     else:
+        out[(ax+1) % 4] = v1
+        out[(ax+2) % 4] = v2
+        out[(ax+3) % 4] = v3
         out[ax] = math.sqrt(1-sqSum)
     return out, outRest, outMagDist
 
 
+def decodeQuatArray(quats: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode an array of compressed 64-bit integer quaternions.
+
+    Vectorized counterpart of :py:func:`decodeQuat` for decoding whole recordings at once, e.g., a ``quat`` column
+    obtained from :py:func:`capture2go.loadBinaryFile`.
+
+    Args:
+        quats (np.ndarray): Array of 64-bit integer encoded quaternions, shape (N,).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - np.ndarray: Decoded quaternions, shape (N, 4). Invalid entries are NaN-filled.
+            - np.ndarray: outRest flags, shape (N,).
+            - np.ndarray: outMagDist flags, shape (N,).
+    """
+    quats = np.asarray(quats, np.uint64)
+    outRest = ((quats >> 62) & 1).astype(bool)
+    outMagDist = ((quats >> 63) & 1).astype(bool)
+    ax = ((quats >> 60) & 3).astype(np.intp)
+    vals = np.empty((len(quats), 3))
+    vals[:, 0] = ((quats >> 40) & 0xFFFFF) * _INV_SCALE - _OFFSET
+    vals[:, 1] = ((quats >> 20) & 0xFFFFF) * _INV_SCALE - _OFFSET
+    vals[:, 2] = (quats & 0xFFFFF) * _INV_SCALE - _OFFSET
+    sqSum = np.einsum('ij,ij->i', vals, vals)
+
+    out = np.empty((len(quats), 4))
+    rows = np.arange(len(quats))
+    out[rows, (ax + 1) % 4] = vals[:, 0]
+    out[rows, (ax + 2) % 4] = vals[:, 1]
+    out[rows, (ax + 3) % 4] = vals[:, 2]
+    out[rows, ax] = np.sqrt(np.clip(1 - sqSum, 0, None))
+
+    invalid = sqSum > 1
+    if invalid.any():  # Note: This should never ever happen. Do not remove this warning!
+        for quat, s in zip(quats[invalid], sqSum[invalid]):
+            print(f'warning: invalid quat {quat} with sqSum {s}')
+        out[invalid] = np.nan
+    return out, outRest, outMagDist
+
+
 def generateSyncId() -> int:
     """
     Generate a random 64-bit synchronization ID.
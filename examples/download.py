@@ -5,11 +5,17 @@
 
 import argparse
 import asyncio
+import os
 import sys
+import time
 from pathlib import Path
 import capture2go as c2g
 
 
+WINDOW = 4
+"""Number of range requests kept in flight, so the device never idles waiting for the next request."""
+
+
 async def listFiles(imu: c2g.AbstractDevice) -> list[str]:
     names: list[str] = []
     await imu.send(c2g.pkg.CmdFsListFiles())
@@ -35,11 +41,17 @@ async def listFiles(imu: c2g.AbstractDevice) -> list[str]:
     return names
 
 
-async def downloadFile(imu: c2g.AbstractDevice, filename: str, delete: bool = False) -> bool:
-    sizePkg = await imu.sendAndAwaitAck(c2g.pkg.CmdFsGetSize(filename=filename.encode()), c2g.pkg.DataFsSize)
+async def getSize(imu: c2g.AbstractDevice, filename: str) -> int:
+    filenameBytes = filename.encode()
+    sizePkg = await imu.sendAndAwaitAck(c2g.pkg.CmdFsGetSize(filename=filenameBytes), c2g.pkg.DataFsSize)
     assert isinstance(sizePkg, c2g.pkg.DataFsSize), 'failed to get size from sensor'
-    assert sizePkg.filename == filename.encode()
-    size = sizePkg.fileSize
+    assert sizePkg.filename == filenameBytes
+    return sizePkg.fileSize
+
+
+async def downloadFile(imu: c2g.AbstractDevice, filename: str, delete: bool = False, size: int | None = None) -> bool:
+    if size is None:
+        size = await getSize(imu, filename)
 
     outPath = Path(f'{filename}_{imu.name}.bin')
     if outPath.exists():
@@ -47,9 +59,33 @@ async def downloadFile(imu: c2g.AbstractDevice, filename: str, delete: bool = Fa
         sys.exit(1)
 
     print(f'Downloading {filename!r} ({size} bytes)...')
-    with open(outPath, 'wb') as f:
-        await imu.send(c2g.pkg.CmdFsGetBytes(filename=filename.encode(), startPos=0, endPos=0))
-        received = 0
+    filenameBytes = filename.encode()  # Encode once instead of per range request.
+    chunkSize = imu.fsChunkSize
+    received = 0
+    nextPos = 0
+    lastProgress = 0.0
+
+    # Build the range request once and only update startPos/endPos per chunk; send() serializes it on each call,
+    # so reusing the object just avoids re-creating the struct and re-copying the filename for every chunk.
+    getBytesCmd = c2g.pkg.CmdFsGetBytes(filename=filenameBytes)
+
+    async def fillWindow():
+        # Request the file in fsChunkSize ranges and keep up to WINDOW of them outstanding, so the next chunk is
+        # already queued on the device while the previous one is still being transferred.
+        nonlocal nextPos
+        while nextPos < size and nextPos - received < WINDOW * chunkSize:
+            end = min(nextPos + chunkSize, size)
+            getBytesCmd.startPos = nextPos
+            getBytesCmd.endPos = end
+            await imu.send(getBytesCmd)
+            nextPos = end
+
+    # A 1 MiB write buffer coalesces the many small payloads into few large write() calls.
+    with open(outPath, 'wb', buffering=1024*1024) as f:
+        # Preallocate the full file so the filesystem can reserve contiguous space instead of growing the file
+        # with every flushed chunk.
+        f.truncate(size)
+        await fillWindow()
         async for package in imu:
             if not isinstance(package, c2g.pkg.DataFsBytes):
                 continue  # Ignore unrelated packages while downloading.
@@ -61,13 +97,17 @@ async def downloadFile(imu: c2g.AbstractDevice, filename: str, delete: bool = Fa
 
             f.write(package.payload)
             received += len(package.payload)
-            print(f'Received {len(package.payload)} bytes, {received} of {size} received ({received/size*100:.1f}%)')
+            await fillWindow()
+            # Printing per received package easily dominates on fast links; report progress at most every 100 ms.
+            if (now := time.monotonic()) - lastProgress >= 0.1 or received == size:
+                lastProgress = now
+                print(f'Received {received} of {size} bytes ({received/size*100:.1f}%)')
 
             if received == size:
                 print(f'File transfer complete. Saved as {outPath}.')
                 if delete:
                     await imu.sendAndAwaitAck(
-                        c2g.pkg.CmdFsDeleteFile(filename=filename.encode()),
+                        c2g.pkg.CmdFsDeleteFile(filename=filenameBytes),
                         c2g.pkg.AckFsDeleteFile,
                     )
                     print(f'Deleted {filename!r} from device.')
@@ -78,7 +118,9 @@ async def downloadFile(imu: c2g.AbstractDevice, filename: str, delete: bool = Fa
 async def downloadAll(imu: c2g.AbstractDevice, delete: bool = False):
     files = await listFiles(imu)
 
-    existing = [path for name in files if (path := Path(f'{name}_{imu.name}.bin')).exists()]
+    # One directory scan instead of a stat call per file.
+    existingNames = {entry.name for entry in os.scandir()}
+    existing = [outName for name in files if (outName := f'{name}_{imu.name}.bin') in existingNames]
     if existing:
         print(f'Error: The following {len(existing)} output file(s) already exist:', file=sys.stderr)
         for p in existing:
@@ -88,13 +130,19 @@ async def downloadAll(imu: c2g.AbstractDevice, delete: bool = False):
 
     successful = 0
     failed: list[str] = []
+    size = await getSize(imu, files[0]) if files else 0
     for i, filename in enumerate(files):
+        # Request the size of the next file up front so its roundtrip overlaps with the current transfer. Only one
+        # size request may be outstanding at a time, since acks are matched by package type.
+        nextSizeTask = asyncio.create_task(getSize(imu, files[i+1])) if i + 1 < len(files) else None
         print(f'Downloading file {i+1} of {len(files)}: {filename!r}...')
-        ok = await downloadFile(imu, filename, delete=delete)
+        ok = await downloadFile(imu, filename, delete=delete, size=size)
         if ok:
             successful += 1
         else:
             failed.append(filename)
+        if nextSizeTask is not None:
+            size = await nextSizeTask
 
     if successful == len(files):
         print(f'All {len(files)} file(s) downloaded successfully.')
@@ -10,21 +10,21 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import threading
-import queue
+import collections
 
 import capture2go as c2g
 
 # matplotlib.use('QtAgg')
 
 
-async def getImuData(name: str, q: queue.Queue):
+async def getImuData(name: str, q: collections.deque):
     imu, = await c2g.connect([name])
     await imu.init(setTime=True, abortStreaming=True)
     await imu.send(c2g.pkg.CmdSetMeasurementMode(fullPackedMode=c2g.pkg.SamplingMode.MODE_200HZ, statusMode=1))
     await imu.send(c2g.pkg.CmdStartStreaming())
     try:
         async for package in imu:
-            q.put(package)
+            q.append(package)
     except asyncio.CancelledError:
         print('Stopping streaming.')
         await imu.send(c2g.pkg.CmdStopStreaming())
@@ -33,14 +33,18 @@ async def getImuData(name: str, q: queue.Queue):
 
 class ImuDataPlot:
     def __init__(self):
-        self.queue = queue.Queue()
+        # Single-producer/single-consumer handoff. deque append/popleft are thread-safe in CPython and skip
+        # queue.Queue's per-item locking; maxlen drops the oldest packages if the GUI falls behind during bursts.
+        self.queue = collections.deque(maxlen=2000)
 
         self.N = 800  # Number of samples to plot (at 200 Hz).
         self.t = np.arange(-self.N, 0, dtype=float)/200
+        # History arrays are fixed-size ring buffers written at `self.idx`, so scrolling does not copy the arrays.
         self.gyr = np.full((self.N, 3), np.nan)
         self.acc = np.full((self.N, 3), np.nan)
         self.mag = np.full((self.N, 3), np.nan)
         self.euler = np.full((self.N, 3), np.nan)
+        self.idx = 0
 
         self.createPlot()
 
@@ -86,37 +90,49 @@ class ImuDataPlot:
             ax.grid()
 
     def updatePlot(self, frame):
-        # Read IMU data from the queue.
-        while True:
-            try:
-                package = self.queue.get_nowait()
-                if isinstance(package, c2g.pkg.DataFullPacked):
-                    parsed = package.parse()
-                    self.gyr = np.vstack([self.gyr[8:], np.rad2deg(parsed['gyr'])])
-                    self.acc = np.vstack([self.acc[8:], parsed['acc']])
-                    self.mag = np.vstack([self.mag[8:], parsed['mag']])
-
-                    euler = np.zeros((8, 3))
-                    for i in range(8):
-                        euler[i] = np.rad2deg(c2g.utils.eulerAngles(parsed['quat9D'][i], 'zxy', True))
-                    self.euler = np.vstack([self.euler[8:], euler])
-                else:
-                    print('package:', package)
-            except queue.Empty:
-                break
-
-        # Update the plot.
+        # Read IMU data from the queue, writing each packet straight into the ring buffers. The in-place rad2deg
+        # conversions reuse the arrays returned by parse() and eulerAngles() instead of allocating temporaries.
+        while self.queue:
+            package = self.queue.popleft()
+            if isinstance(package, c2g.pkg.DataFullPacked):
+                parsed = package.parse()
+                self._writeRing(self.gyr, np.rad2deg(parsed['gyr'], out=parsed['gyr']))
+                self._writeRing(self.acc, parsed['acc'])
+                self._writeRing(self.mag, parsed['mag'])
+                euler = c2g.utils.eulerAngles(parsed['quat9D'], 'zxy', True)
+                self._writeRing(self.euler, np.rad2deg(euler, out=euler))
+                self.idx = (self.idx + len(parsed['gyr'])) % self.N
+            else:
+                print('package:', package)
+
+        # Update the plot. Rotating each ring buffer so the write position ends up at the right edge is one
+        # contiguous copy per quantity; the axes limits are fixed in createPlot so blitting keeps the cached
+        # backgrounds valid.
+        gyr = np.concatenate([self.gyr[self.idx:], self.gyr[:self.idx]])
+        acc = np.concatenate([self.acc[self.idx:], self.acc[:self.idx]])
+        mag = np.concatenate([self.mag[self.idx:], self.mag[:self.idx]])
+        euler = np.concatenate([self.euler[self.idx:], self.euler[:self.idx]])
         for i, line in enumerate(self.gyrLines):
-            line.set_ydata(self.gyr[:, i])
+            line.set_ydata(gyr[:, i])
         for i, line in enumerate(self.accLines):
-            line.set_ydata(self.acc[:, i])
+            line.set_ydata(acc[:, i])
         for i, line in enumerate(self.magLines):
-            line.set_ydata(self.mag[:, i])
+            line.set_ydata(mag[:, i])
         for i, line in enumerate(self.eulerLines):
-            line.set_ydata(self.euler[:, i])
+            line.set_ydata(euler[:, i])
 
         return self.gyrLines + self.accLines + self.magLines + self.eulerLines
 
+    def _writeRing(self, target, chunk):
+        # Write a chunk of new samples into the ring buffer at the current write position, wrapping at the end.
+        end = self.idx + len(chunk)
+        if end <= self.N:
+            target[self.idx:end] = chunk
+        else:
+            split = self.N - self.idx
+            target[self.idx:] = chunk[:split]
+            target[:end - self.N] = chunk[split:]
+
 
 def main():
     parser = argparse.ArgumentParser(description='Example for real-time streaming of IMU orientations.')
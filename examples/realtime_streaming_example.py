@@ -5,11 +5,26 @@
 
 import argparse
 import asyncio
+import queue
+import sys
+import threading
 import numpy as np
 
 import capture2go as c2g
 
 
+_R2D = 180/np.pi
+
+_printQueue: queue.SimpleQueue = queue.SimpleQueue()
+
+
+def _printWorker():
+    # Runs on a daemon thread so a slow or blocking stdout (e.g., a paused terminal) never stalls the async
+    # receive loops.
+    while True:
+        sys.stdout.write(_printQueue.get() + '\n')
+
+
 async def printOrientation(index: int, imu: c2g.AbstractDevice, mag: bool, euler: bool, raw: bool):
     indentation = ' '*(60*index)
     setTime = index == 0
@@ -17,7 +32,7 @@ async def printOrientation(index: int, imu: c2g.AbstractDevice, mag: bool, euler
     await imu.send(c2g.pkg.CmdStartRealTimeStreaming(mode=c2g.pkg.RealTimeDataMode.REAL_TIME_DATA_QUAT, rateLimit=0))
     async for package in imu:
         if raw or not isinstance(package, c2g.pkg.DataQuatFixedRt):
-            print(f'{imu}: {package}')
+            _printQueue.put(f'{imu}: {package}')
         else:
             parsed = package.parse()
             t = parsed['timestamp']/1e9
@@ -28,10 +43,10 @@ async def printOrientation(index: int, imu: c2g.AbstractDevice, mag: bool, euler
                 quat = parsed['quat']
             if euler:
                 angles = c2g.utils.eulerAngles(quat, 'zxy', True)
-                orientation = f'{np.round(np.rad2deg(angles), 2)}'
+                orientation = f'{np.round(angles * _R2D, 2)}'
             else:
                 orientation = f'{quat}'
-            print(f'{t:.3f} {indentation}{orientation}')
+            _printQueue.put(f'{t:.3f} {indentation}{orientation}')
 
 
 async def main():
@@ -48,6 +63,8 @@ async def main():
 
     imus = await c2g.connect(args.devices)
 
+    threading.Thread(target=_printWorker, daemon=True).start()
+
     try:
         await asyncio.gather(*[printOrientation(i, imu, args.mag, args.euler, args.raw) for i, imu in enumerate(imus)])
     except asyncio.CancelledError:
@@ -8,6 +8,7 @@ import asyncio
 import copy
 import json
 import os
+import signal
 import time
 import uuid
 from datetime import timedelta
@@ -15,6 +16,14 @@ from pathlib import Path
 
 import capture2go as c2g
 
+try:
+    import orjson  # Optional; serializes JSON in native code.
+except ImportError:
+    orjson = None
+
+
+WINDOW = 4
+"""Number of range requests kept in flight, so the device never idles waiting for the next request."""
 
 PROFILE_TEMPLATE = {
     'type': 'capture2go_measurement_profile',
@@ -59,15 +68,33 @@ class Annotations:
     def __init__(self, path: Path | str, startTime: float):
         self.path = Path(path)
         self.startTimeSec = startTime
-        with open(self.path, 'w') as f:
-            f.write('date,timestamp,elapsed,internal,event\n')
+        # Keep the file open with line buffering, so each annotation is a single write instead of an
+        # open/write/close cycle and still hits the disk promptly.
+        self.f = open(self.path, 'w', buffering=1)
+        self.f.write('date,timestamp,elapsed,internal,event\n')
 
     def annotate(self, event: str, internal: bool = False):
         now = time.time()
         dateStr = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
         elapsedTd = timedelta(seconds=int((now - self.startTimeSec)))
-        with open(self.path, 'a') as f:
-            f.write(f'{dateStr},{int(now * 1_000_000_000)},{elapsedTd},{int(internal)},{event}\n')
+        self.f.write(f'{dateStr},{int(now * 1_000_000_000)},{elapsedTd},{int(internal)},{event}\n')
+
+    def close(self):
+        self.f.close()
+
+
+def dumpJson(obj, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def writeInfoJson(recordingDir: Path, info: dict, indent: bool = False):
+    # Write to a temporary file and rename it into place, so a crash mid-write never leaves a truncated info.json
+    # behind. Intermediate versions skip the indentation; only the final one is pretty-printed.
+    tmpPath = recordingDir / 'info.json.tmp'
+    tmpPath.write_bytes(dumpJson(info, indent))
+    os.replace(tmpPath, recordingDir / 'info.json')
 
 
 async def setupRecording(index: int, imu: c2g.AbstractDevice, filename: str, syncId: int):
@@ -87,9 +114,7 @@ async def startRecording(imu: c2g.AbstractDevice):
     await imu.sendAndAwaitAck(c2g.pkg.CmdStartRecording(), c2g.pkg.AckStartRecording)
 
     # Discard all packages received until now (`sendAndAwaitAck` won't clear them from the queue).
-    async for package in imu:
-        if isinstance(package, c2g.pkg.AckStartRecording):
-            break
+    await imu.drainUntil(c2g.pkg.AckStartRecording)
 
 
 async def stopRecording(imu: c2g.AbstractDevice):
@@ -97,17 +122,42 @@ async def stopRecording(imu: c2g.AbstractDevice):
 
 
 async def downloadAndDelete(imu: c2g.AbstractDevice, filename: str, recordingDir: Path) -> bool:
+    filenameBytes = filename.encode()  # Encode once instead of per command.
+
     # Get file size from sensor.
-    sizePkg = await imu.sendAndAwaitAck(c2g.pkg.CmdFsGetSize(filename=filename.encode()), c2g.pkg.DataFsSize)
+    sizePkg = await imu.sendAndAwaitAck(c2g.pkg.CmdFsGetSize(filename=filenameBytes), c2g.pkg.DataFsSize)
     assert isinstance(sizePkg, c2g.pkg.DataFsSize), 'failed to get size from sensor'
-    assert sizePkg.filename == filename.encode()
+    assert sizePkg.filename == filenameBytes
     size = sizePkg.fileSize
 
     # Download file contents.
-    await imu.send(c2g.pkg.CmdFsGetBytes(filename=filename.encode(), startPos=0, endPos=0))
+    chunkSize = imu.fsChunkSize
     received = 0
+    nextPos = 0
+    lastProgress = 0.0
+
+    # Build the range request once and only update startPos/endPos per chunk; send() serializes it on each call,
+    # so reusing the object just avoids re-creating the struct and re-copying the filename for every chunk.
+    getBytesCmd = c2g.pkg.CmdFsGetBytes(filename=filenameBytes)
+
+    async def fillWindow():
+        # Request the file in fsChunkSize ranges and keep up to WINDOW of them outstanding, so the next chunk is
+        # already queued on the device while the previous one is still being transferred.
+        nonlocal nextPos
+        while nextPos < size and nextPos - received < WINDOW * chunkSize:
+            end = min(nextPos + chunkSize, size)
+            getBytesCmd.startPos = nextPos
+            getBytesCmd.endPos = end
+            await imu.send(getBytesCmd)
+            nextPos = end
+
     outPath = recordingDir / 'raw' / f'{filename}_{imu.name}.bin'
-    with open(outPath, 'wb') as f:
+    # A 1 MiB write buffer coalesces the many small payloads into few large write() calls.
+    with open(outPath, 'wb', buffering=1024*1024) as f:
+        # Preallocate the full file so the filesystem can reserve contiguous space instead of growing the file
+        # with every flushed chunk.
+        f.truncate(size)
+        await fillWindow()
         async for package in imu:
             if not isinstance(package, c2g.pkg.DataFsBytes):
                 continue
@@ -118,13 +168,16 @@ async def downloadAndDelete(imu: c2g.AbstractDevice, filename: str, recordingDir
                 return False
 
             received += len(package.payload)
-            print(f'[{imu.name}] Received {len(package.payload)} bytes, '
-                  f'{received} of {size} received ({received/size*100:.1f}%)')
+            # Printing per received package easily dominates on fast links; report progress at most every 100 ms.
+            if (now := time.monotonic()) - lastProgress >= 0.1 or received == size:
+                lastProgress = now
+                print(f'[{imu.name}] Received {received} of {size} bytes ({received/size*100:.1f}%)')
             f.write(package.payload)
+            await fillWindow()
 
             if received == size:
                 print(f'[{imu.name}] File transfer complete. Saved as {outPath}.')
-                await imu.sendAndAwaitAck(c2g.pkg.CmdFsDeleteFile(filename=filename.encode()), c2g.pkg.AckFsDeleteFile)
+                await imu.sendAndAwaitAck(c2g.pkg.CmdFsDeleteFile(filename=filenameBytes), c2g.pkg.AckFsDeleteFile)
                 return True
 
     return False
@@ -148,8 +201,7 @@ async def record(imus: list[c2g.AbstractDevice]):
         {'name': f'imu{i+1}', 'id': imu.name}
         for i, imu in enumerate(imus)
     ]
-    with open(recordingDir / 'profile.json', 'w') as f:
-        json.dump(profile, f, indent=2)
+    (recordingDir / 'profile.json').write_bytes(dumpJson(profile, indent=True))
 
     # Write info.json to be compatible with recordings created by the mobile app.
     info = copy.deepcopy(INFO_TEMPLATE)
@@ -158,43 +210,66 @@ async def record(imus: list[c2g.AbstractDevice]):
     info['startTimestamp'] = int(startTime * 1000)
     info['startDate'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(startTime))
     info['transferIncomplete'] = [imu.name for imu in imus]
-    with open(recordingDir / 'info.json', 'w') as f:
-        json.dump(info, f, indent=2)
+    writeInfoJson(recordingDir, info)
 
     # Start recording on all devices in parallel.
     await asyncio.gather(*[startRecording(imu) for imu in imus])
 
     annotations = Annotations(recordingDir / 'annotations.csv', startTime)
-    annotations.annotate('MEASUREMENT_STARTED', internal=True)
-
-    print('Recording... Press Ctrl+C to stop.')
     try:
-        while True:
-            for imu in imus:
-                if (package := imu.poll()) is not None:
-                    if isinstance(package, c2g.pkg.DataStatus):
-                        print('.', end='', flush=True)
-                    else:
-                        print(f'\n{imu.name}: received during recording:', package)
-            await asyncio.sleep(0.05)
-    except (KeyboardInterrupt, asyncio.CancelledError):
+        annotations.annotate('MEASUREMENT_STARTED', internal=True)
+
+        print('Recording... Press Ctrl+C to stop.')
+
+        async def drain(imu: c2g.AbstractDevice):
+            # React to packages as they arrive instead of polling every device every 50 ms.
+            async for package in imu:
+                if isinstance(package, c2g.pkg.DataStatus):
+                    print('.', end='', flush=True)
+                else:
+                    print(f'\n{imu.name}: received during recording:', package)
+
+        drainTasks = [asyncio.create_task(drain(imu)) for imu in imus]
+        stopEvent = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, stopEvent.set)
+        except NotImplementedError:
+            pass  # Not supported on Windows; Ctrl+C raises KeyboardInterrupt in the wait below instead.
+        try:
+            await stopEvent.wait()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except NotImplementedError:
+                pass
+            for task in drainTasks:
+                task.cancel()
+            await asyncio.gather(*drainTasks, return_exceptions=True)
         print('Recording stopped by user.')
 
-    # Stop recording on all devices.
-    await asyncio.gather(*[stopRecording(imu) for imu in imus])
-
-    annotations.annotate('MEASUREMENT_STOPPED', internal=True)
+        # Stop recording on all devices.
+        await asyncio.gather(*[stopRecording(imu) for imu in imus])
 
-    # Download files from the devices.
-    for imu in imus:
-        print(f'[{imu.name}] Downloading...')
-        ok = await downloadAndDelete(imu, filename, recordingDir)
-        if ok:
+        annotations.annotate('MEASUREMENT_STOPPED', internal=True)
+    finally:
+        annotations.close()
+
+    # Download files from all devices concurrently; every device is an independent link, so the total wall time is
+    # the slowest transfer instead of the sum of all transfers.
+    print(f'Downloading from {len(imus)} device(s)...')
+    results = await asyncio.gather(*[downloadAndDelete(imu, filename, recordingDir) for imu in imus],
+                                   return_exceptions=True)
+    for imu, result in zip(imus, results):
+        if result is True:
             info['transferIncomplete'].remove(imu.name)
+        elif isinstance(result, BaseException):
+            print(f'[{imu.name}] Download failed: {result!r}')
 
     # Update info.json with final `transferIncomplete` list.
-    with open(recordingDir / 'info.json', 'w') as f:
-        json.dump(info, f, indent=2)
+    writeInfoJson(recordingDir, info, indent=True)
 
     if len(info['transferIncomplete']) == 0:
         print('All device recordings downloaded and deleted successfully.')